@@ -1,40 +1,48 @@
 import streamlit as st
-from dataclasses import dataclass
-from typing import Set, Dict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Diagnosis:
     name: str
-    required_symptoms: Set[str]
-    optional_symptoms: Set[str]
-    red_flags: Set[str]
-    suggested_tests: Set[str]
-    suggested_treatments: Set[str]
+    required_symptoms: FrozenSet[str]
+    optional_symptoms: FrozenSet[str]
+    red_flags: FrozenSet[str]
+    suggested_tests: FrozenSet[str]
+    suggested_treatments: FrozenSet[str]
+    # Sorted display strings, joined once so every rerun renders identical text
+    tests_str: str = field(init=False)
+    treatments_str: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "tests_str", ", ".join(sorted(self.suggested_tests)))
+        object.__setattr__(self, "treatments_str", ", ".join(sorted(self.suggested_treatments)))
 
 # ------------------ Knowledge Base ------------------
 kb: Dict[str, Diagnosis] = {
     "muscular_strain": Diagnosis(
         name="Muscular Strain",
-        required_symptoms={"local back pain"},
-        optional_symptoms={
+        required_symptoms=frozenset({"local back pain"}),
+        optional_symptoms=frozenset({
             "pain when moving",
             "muscle tightness",
             "pain gets better with rest",
             "morning stiffness"
-        },
-        red_flags=set(),
-        suggested_tests={"Physical Examination"},
-        suggested_treatments={"Rest", "Physiotherapy", "NSAIDs"}
+        }),
+        red_flags=frozenset(),
+        suggested_tests=frozenset({"Physical Examination"}),
+        suggested_treatments=frozenset({"Rest", "Physiotherapy", "NSAIDs"})
     ),
 
     "disc_herniation": Diagnosis(
         name="Disc Herniation",
-        required_symptoms={
+        required_symptoms=frozenset({
             "radiating pain from back to leg",
             "pain worse with cough or sneeze",
             "sharp back or leg pain"
-        },
-        optional_symptoms={
+        }),
+        optional_symptoms=frozenset({
             "numbness",
             "tingling",
             "leg weakness",
@@ -42,122 +50,164 @@ kb: Dict[str, Diagnosis] = {
             "foot pain",
             "pain when bending or twisting",
             "arm or shoulder pain"
-        },
-        red_flags={
+        }),
+        red_flags=frozenset({
             "trouble controlling bladder",
             "numbness between legs",
             "leg weakness"
-        },
-        suggested_tests={"MRI", "CT Scan", "Physical Examination"},
-        suggested_treatments={"Physical Therapy", "Pain Management", "Surgery if severe"}
+        }),
+        suggested_tests=frozenset({"MRI", "CT Scan", "Physical Examination"}),
+        suggested_treatments=frozenset({"Physical Therapy", "Pain Management", "Surgery if severe"})
     ),
 
     "sciatica": Diagnosis(
         name="Sciatica / Nerve Compression",
-        required_symptoms={
+        required_symptoms=frozenset({
             "radiating pain from back to leg",
             "pain worse with cough or sneeze",
             "numbness",
             "tingling"
-        },
-        optional_symptoms={
+        }),
+        optional_symptoms=frozenset({
             "leg weakness",
             "loss of bladder control",
             "loss of bowel control",
             "pain when raising leg",
             "pain below knee"
-        },
-        red_flags={
+        }),
+        red_flags=frozenset({
             "loss of bladder control",
             "loss of bowel control"
-        },
-        suggested_tests={"MRI", "X-Ray", "Nerve Conduction Study"},
-        suggested_treatments={
+        }),
+        suggested_tests=frozenset({"MRI", "X-Ray", "Nerve Conduction Study"}),
+        suggested_treatments=frozenset({
             "NSAIDs",
             "Physical Therapy",
             "Epidural Steroid Injection",
             "Surgery if severe"
-        }
+        })
     )
 }
 
 # ------------------ Session State Init ------------------
 if "provided" not in st.session_state:
-    st.session_state.provided = set()
+    st.session_state.provided = frozenset()
 if "diagnosed" not in st.session_state:
     st.session_state.diagnosed = False
 
-def build_symptom_list(kb):
-    symptoms = set()
-    for diag in kb.values():
-        symptoms.update(diag.required_symptoms)
-        symptoms.update(diag.optional_symptoms)
-    return sorted(list(symptoms))
+# ------------------ Precomputed KB Structures ------------------
+# Streamlit re-executes this script on every interaction, so the KB-derived
+# lookups are built once and served from the cache on later reruns.
+def symptoms_to_mask(symptoms, symptom_bit):
+    # Symptoms outside the selectable list (e.g. unlisted red flags) can never
+    # be provided, so they get no bit.
+    mask = 0
+    for symptom in symptoms:
+        bit = symptom_bit.get(symptom)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
 
-# ------------------ Streamlit UI ------------------
-# Custom CSS for medical-inspired styling
-st.markdown("""
-<style>
-    .main {
-        background-color: #f0f8ff;  /* Light blue background */
-    }
-    .stButton>button {
-        background-color: #4CAF50;  /* Green for yes */
-        color: white;
-        border-radius: 10px;
-        font-size: 16px;
-    }
-    .stButton>button:hover {
-        background-color: #45a049;
-    }
-    .title {
-        color: #2E86C1;  /* Medical blue */
-        font-family: 'Arial', sans-serif;
-        text-align: center;
-    }
-    .input-box {
-        background-color: transparent;
-        border: 2px solid #2E86C1;
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px 0;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-    }
-    .diagnosis-card {
-        background-color: transparent;
-        border: 2px solid #28B463;
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px 0;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-    }
-    .red-flag {
-        background-color: transparent;
-        border: 2px solid #E74C3C;
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px 0;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-    }
-    .large-text {
-        font-size: 36px;
-        font-weight: bold;
+@st.cache_data
+def build_symptom_index():
+    all_symptoms = frozenset().union(
+        *(diag.required_symptoms | diag.optional_symptoms for diag in kb.values())
+    )
+    symptom_list = tuple(sorted(all_symptoms))
+    symptom_bit = {symptom: i for i, symptom in enumerate(symptom_list)}
+    # Per diagnosis: (required_mask, optional_mask, red_flag_mask)
+    diag_masks = {
+        key: (
+            symptoms_to_mask(diag.required_symptoms, symptom_bit),
+            symptoms_to_mask(diag.optional_symptoms, symptom_bit),
+            symptoms_to_mask(diag.red_flags, symptom_bit),
+        )
+        for key, diag in kb.items()
     }
-</style>
-""", unsafe_allow_html=True)
+    return all_symptoms, symptom_list, symptom_bit, diag_masks
+
+ALL_SYMPTOMS, SYMPTOM_LIST, SYMPTOM_BIT, DIAG_MASKS = build_symptom_index()
+
+def mask_to_symptoms(mask):
+    return [symptom for i, symptom in enumerate(SYMPTOM_LIST) if mask >> i & 1]
+
+@st.cache_data
+def diagnose(provided: FrozenSet[str]) -> Tuple[Optional[str], int, Tuple[str, ...]]:
+    # Best-first: track the one with highest score (most matches) while scoring
+    provided_mask = symptoms_to_mask(provided, SYMPTOM_BIT)
+    final_diag_key, best_score = None, -1
+    for key, (req_mask, opt_mask, _) in DIAG_MASKS.items():
+        score = 2 * (provided_mask & req_mask).bit_count()
+        score += (provided_mask & opt_mask).bit_count()
+        if score > best_score:
+            final_diag_key, best_score = key, score
+
+    red_flags_detected = ()
+    if final_diag_key is not None:
+        red_flags_detected = tuple(mask_to_symptoms(provided_mask & DIAG_MASKS[final_diag_key][2]))
+    return final_diag_key, best_score, red_flags_detected
+
+# ------------------ Result Rendering ------------------
+def render_diagnosis(provided):
+    # Score final diagnosis using best-first like scoring (cached per symptom set)
+    final_diag_key, _, red_flags_detected = diagnose(provided)
+
+    # Each st.* call is a separate element delta, so the result is rendered as
+    # one HTML block (the red-flag warning stays separate, see below).
+    provided_text = ", ".join(sorted(provided)) if provided else "None"
+    result_html = (
+        "<div class='diagnosis-card'>"
+        "<h3><span style='color: red;'>➕</span> Diagnosis Complete!</h3>"
+        f"<p><b>🩹 Symptoms provided by patient:</b> {provided_text}</p>"
+        "</div>"
+    )
+    
+    if final_diag_key is not None:
+        final_diag = kb[final_diag_key]
+        
+        result_html += (
+            "<div class='red-flag'>"
+            f"<p class='large-text'>🏥 Final Diagnosis: {final_diag.name}</p>"
+            "</div>"
+        )
+        st.markdown(result_html, unsafe_allow_html=True)
+        
+        if red_flags_detected:
+            st.write("***🚨 URGENT MEDICAL ATTENTION ADVISED ***")
+            st.write("Red Flag Symptoms Detected:", ", ".join(red_flags_detected))
+        else:
+            st.success("✅ No immediate red flags detected.")
+
+        st.markdown(
+            f"<p><b>🧪 Suggested Tests:</b> {final_diag.tests_str}</p>"
+            f"<p><b>💊 Suggested Treatments:</b> {final_diag.treatments_str}</p>",
+            unsafe_allow_html=True
+        )
+    else:
+        st.markdown(result_html, unsafe_allow_html=True)
+        st.write("**🏥 Final Diagnosis:** Unable to determine (no matching diagnoses)")
+
+# ------------------ Streamlit UI ------------------
+# Custom CSS for medical-inspired styling, kept in style.css next to this script
+@st.cache_data
+def load_css():
+    css = (Path(__file__).parent / "style.css").read_text(encoding="utf-8")
+    return f"<style>\n{css}</style>"
+
+# Injected on every run: Streamlit drops any element a rerun does not
+# re-emit, so skipping this after the first run would unstyle the page.
+st.markdown(load_css(), unsafe_allow_html=True)
 
 st.markdown("<h1 class='title'>🩺 Back Pain Diagnosis Assistant</h1>", unsafe_allow_html=True)
 st.markdown("<p style='text-align: center; color: #2E86C1;'>Enter patient symptoms and get a diagnosis using Best-First Search 💡</p>", unsafe_allow_html=True)
 
-symptom_list = build_symptom_list(kb)
-
 if not st.session_state.diagnosed:
     st.write("**📝 Enter Patient Symptoms:**")
     st.write("Please select at least 4 symptoms from the list below. Suggestions will appear as you type.")
     
     selected_symptoms = st.multiselect(
         "Select symptoms (type to search and select):",
-        options=symptom_list,
+        options=SYMPTOM_LIST,
         default=[],
         help="Choose from the available symptoms. At least 4 are required for diagnosis."
     )
@@ -169,44 +219,13 @@ if not st.session_state.diagnosed:
         diagnose_button = st.button("🔍 Diagnose")
     
     if diagnose_button:
-        st.session_state.provided = set(selected_symptoms)
+        st.session_state.provided = frozenset(selected_symptoms)
         st.session_state.diagnosed = True
         st.rerun()
 
 if st.session_state.diagnosed:
-    st.markdown("<div class='diagnosis-card'>", unsafe_allow_html=True)
-    st.write("### <span style='color: red;'>➕</span> Diagnosis Complete!", unsafe_allow_html=True)
-    st.write("**🩹 Symptoms provided by patient:**", ", ".join(sorted(st.session_state.provided)) if st.session_state.provided else "None")
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    # Score final diagnosis using best-first like scoring (prioritize based on matches)
-    scores = {}
-    for key, diag in kb.items():
-        score = 2 * len(diag.required_symptoms.intersection(st.session_state.provided))
-        score += len(diag.optional_symptoms.intersection(st.session_state.provided))
-        scores[key] = score
-    
-    if scores:
-        # Best-first: select the one with highest score (most matches)
-        final_diag_key = max(scores, key=lambda k: scores[k])
-        final_diag = kb[final_diag_key]
-        
-        st.markdown("<div class='red-flag'>", unsafe_allow_html=True)
-        st.markdown(f"<p class='large-text'>🏥 Final Diagnosis: {final_diag.name}</p>", unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        red_flags_detected = st.session_state.provided.intersection(final_diag.red_flags)
-        if red_flags_detected:
-            st.write("***🚨 URGENT MEDICAL ATTENTION ADVISED ***")
-            st.write("Red Flag Symptoms Detected:", ", ".join(red_flags_detected))
-        else:
-            st.success("✅ No immediate red flags detected.")
-
-        st.write("**🧪 Suggested Tests:**", ", ".join(final_diag.suggested_tests))
-        st.write("**💊 Suggested Treatments:**", ", ".join(final_diag.suggested_treatments))
-    else:
-        st.write("**🏥 Final Diagnosis:** Unable to determine (no matching diagnoses)")
+    render_diagnosis(st.session_state.provided)
 
     if st.button("🔄 Start New Diagnosis"):
-        st.session_state.provided.clear()
+        st.session_state.provided = frozenset()
         st.session_state.diagnosed = False